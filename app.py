@@ -85,7 +85,7 @@ def api_get_recipe_details(recipe_title):
     )
     
     full_data = {
-        "recipe": recipe,
+        "recipe": {k: v for k, v in recipe.items() if not k.startswith("_")},
         "detailed_nutrition": nutrition_details
     }
     
@@ -2,9 +2,8 @@ import os
 import csv
 import json
 from flask import Flask, render_template, request, jsonify
-from werkzeug.utils import secure_filename
 from modules.suggestor import load_recipes, advanced_suggest_recipes
-from modules.ocr import image_to_ingredient_list
+from modules.ocr import image_to_ingredient_list, normalize as ocr_normalize
 import modules.favorites as favorites
 import modules.nutrition as nutrition
 import modules.substitutes as substitutes
@@ -12,9 +11,14 @@ import modules.image_detector as image_detector
 import modules.local_discovery as local_discovery
 import modules.shopping_list as shopping_list
 
+try:
+    from flask_orjson import OrjsonProvider
+except ImportError:
+    OrjsonProvider = None
+
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+if OrjsonProvider is not None:
+    app.json = OrjsonProvider(app)
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
@@ -34,6 +38,14 @@ except Exception as e:
     print(e)
     ALL_RECIPES = []
 
+TITLE_INDEX = {}
+for r in ALL_RECIPES:
+    TITLE_INDEX.setdefault(r['title'], r)
+
+KNOWN_INGREDIENTS = frozenset(
+    ocr_normalize(ing) for r in ALL_RECIPES for ing in r.get("ingredients", [])
+)
+
 @app.route("/")
 def page_home():
     return render_template("index.html")
@@ -78,7 +90,7 @@ def api_suggest_recipes():
 
 @app.route("/api/recipe-details/<recipe_title>")
 def api_get_recipe_details(recipe_title):
-    recipe = next((r for r in ALL_RECIPES if r['title'] == recipe_title), None)
+    recipe = TITLE_INDEX.get(recipe_title)
     
     if not recipe:
         return jsonify({"error": "Recipe not found"}), 404
@@ -91,7 +103,7 @@ def api_get_recipe_details(recipe_title):
     )
     
     full_data = {
-        "recipe": recipe,
+        "recipe": {k: v for k, v in recipe.items() if not k.startswith("_")},
         "detailed_nutrition": nutrition_details
     }
     
@@ -108,15 +120,7 @@ def api_upload_receipt_ocr():
         return jsonify({"error": "No selected file"}), 400
         
     if file:
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(temp_path)
-        
-        known_db = {ing for r in ALL_RECIPES for ing in r.get("ingredients", [])}
-        
-        ingredients, err = image_to_ingredient_list(temp_path, known_db=known_db)
-        
-        os.remove(temp_path)
+        ingredients, err = image_to_ingredient_list(file.read(), known_db=KNOWN_INGREDIENTS)
         
         if err:
             return jsonify({"error": err}), 500
@@ -136,7 +140,7 @@ def api_manage_favorites():
         if not recipe_title:
             return jsonify({"error": "Recipe title is required"}), 400
             
-        recipe_obj = next((r for r in ALL_RECIPES if r['title'] == recipe_title), None)
+        recipe_obj = TITLE_INDEX.get(recipe_title)
         
         if not recipe_obj:
             return jsonify({"error": "Recipe not found"}), 404
@@ -162,13 +166,7 @@ def api_upload_fridge_photo():
         return jsonify({"error": "No selected file"}), 400
         
     if file:
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(temp_path)
-        
-        ingredients, err = image_detector.detect_ingredients(temp_path)
-        
-        os.remove(temp_path)
+        ingredients, err = image_detector.detect_ingredients(file.read())
         
         if err:
             return jsonify({"error": err}), 500
@@ -195,7 +193,7 @@ def api_manage_shopping_list():
         if not recipe_titles:
             return jsonify({"error": "No recipe titles provided"}), 400
             
-        recipes_to_shop = [r for r in ALL_RECIPES if r['title'] in recipe_titles]
+        recipes_to_shop = [TITLE_INDEX[t] for t in recipe_titles if t in TITLE_INDEX]
         
         if not recipes_to_shop:
             return jsonify({"error": "None of the specified recipes were found"}), 404
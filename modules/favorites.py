@@ -1,60 +1,90 @@
 import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _PREFERENCES_PATH = Path("data") / "user_preferences.json"
 _PREFERENCES_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-def _load_preferences_data() -> Dict[str, Any]:
+_CACHE: Optional[Dict[str, Any]] = None
+_CACHE_LOCK = threading.Lock()
+
+def _by_title(entries: Any) -> OrderedDict[str, Dict[str, Any]]:
+    ordered = OrderedDict()
+    if isinstance(entries, list):
+        for e in entries:
+            if isinstance(e, dict):
+                ordered.setdefault(e.get("title"), e)
+    return ordered
+
+def _empty_preferences() -> Dict[str, Any]:
+    return {"favorites": OrderedDict(), "shopping_list": {}, "cooking_history": OrderedDict()}
+
+def _read_preferences_file() -> Dict[str, Any]:
     if not _PREFERENCES_PATH.exists():
-        return {"favorites": [], "shopping_list": {}, "cooking_history": []}
+        return _empty_preferences()
     try:
-        with open(_PREFERENCES_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if not isinstance(data, dict):
-                if isinstance(data, list):
-                    return {"favorites": data, "shopping_list": {}, "cooking_history": []}
-                return {"favorites": [], "shopping_list": {}, "cooking_history": []}
-            if "favorites" not in data:
-                data["favorites"] = []
-            if "shopping_list" not in data:
-                data["shopping_list"] = {}
-            if "cooking_history" not in data:
-                data["cooking_history"] = []
-            return data
+        if orjson is not None:
+            with open(_PREFERENCES_PATH, "rb") as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(_PREFERENCES_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        if not isinstance(data, dict):
+            prefs = _empty_preferences()
+            if isinstance(data, list):
+                prefs["favorites"] = _by_title(data)
+            return prefs
+        data["favorites"] = _by_title(data.get("favorites", []))
+        if "shopping_list" not in data:
+            data["shopping_list"] = {}
+        data["cooking_history"] = _by_title(data.get("cooking_history", []))
+        return data
     except json.JSONDecodeError:
-        return {"favorites": [], "shopping_list": {}, "cooking_history": []}
+        return _empty_preferences()
     except Exception as e:
         print(f"ERROR: Failed to read preferences file: {e}")
-        return {"favorites": [], "shopping_list": {}, "cooking_history": []}
+        return _empty_preferences()
+
+def _load_preferences_data() -> Dict[str, Any]:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = _read_preferences_file()
+    return _CACHE
 
 def _save_preferences_data(data: Dict[str, Any]):
+    on_disk = {
+        k: list(v.values()) if isinstance(v, OrderedDict) else v
+        for k, v in data.items()
+    }
+    tmp_path = _PREFERENCES_PATH.with_suffix(".tmp")
     try:
-        with open(_PREFERENCES_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(on_disk, option=orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(on_disk, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, _PREFERENCES_PATH)
     except Exception as e:
         print(f"ERROR: Could not save to _PREFERENCES_PATH: {e}")
         return
 
-def _load_all_favorites() -> List[Dict[str, Any]]:
-    return _load_preferences_data().get("favorites", [])
-
-def _save_all_favorites(all_list: List[Dict[str, Any]]):
-    try:
-        data = _load_preferences_data()
-        data["favorites"] = all_list
-        _save_preferences_data(data)
-    except Exception as e:
-        print(f"ERROR: Could not save favorites: {e}")
-
 def save_favorite(recipe: Dict[str, Any], note: Optional[str] = None, rating: Optional[int] = None,
                   tags: Optional[List[str]] = None):
     if not recipe or not recipe.get("title"):
         raise ValueError("Recipe must have a title to be saved as favorite.")
-    all_list = _load_all_favorites()
+    title = recipe.get("title")
     entry = {
-        "title": recipe.get("title"),
+        "title": title,
         "ingredients": recipe.get("ingredients", []),
         "steps": recipe.get("steps", []),
         "image_url": recipe.get("image_url"),
@@ -63,32 +93,43 @@ def save_favorite(recipe: Dict[str, Any], note: Optional[str] = None, rating: Op
         "tags": list(tags) if tags else [],
         "added_on": datetime.utcnow().isoformat() + "Z"
     }
-    all_list = [r for r in all_list if r.get("title") != entry["title"]]
-    all_list.insert(0, entry)
-    _save_all_favorites(all_list)
+    with _CACHE_LOCK:
+        data = _load_preferences_data()
+        favs = data["favorites"]
+        favs.pop(title, None)
+        favs[title] = entry
+        favs.move_to_end(title, last=False)
+        _save_preferences_data(data)
 
 def list_favorites() -> List[Dict[str, Any]]:
-    return _load_all_favorites()
+    with _CACHE_LOCK:
+        return list(_load_preferences_data()["favorites"].values())
 
 def remove_favorite(title: str):
     if not title:
         return
-    all_list = [r for r in _load_all_favorites() if r.get("title") != title]
-    _save_all_favorites(all_list)
+    with _CACHE_LOCK:
+        data = _load_preferences_data()
+        if data["favorites"].pop(title, None) is not None:
+            _save_preferences_data(data)
 
 def log_recipe_view(recipe_title: str):
     if not recipe_title:
         return
-    data = _load_preferences_data()
-    history = data.get("cooking_history", [])
     entry = {
         "title": recipe_title,
         "viewed_on": datetime.utcnow().isoformat() + "Z"
     }
-    history = [e for e in history if e.get("title") != recipe_title]
-    history.insert(0, entry)
-    data["cooking_history"] = history[:50]
-    _save_preferences_data(data)
+    with _CACHE_LOCK:
+        data = _load_preferences_data()
+        history = data["cooking_history"]
+        history.pop(recipe_title, None)
+        history[recipe_title] = entry
+        history.move_to_end(recipe_title, last=False)
+        while len(history) > 50:
+            history.popitem(last=True)
+        _save_preferences_data(data)
 
 def list_cooking_history() -> List[Dict[str, Any]]:
-    return _load_preferences_data().get("cooking_history", [])
\ No newline at end of file
+    with _CACHE_LOCK:
+        return list(_load_preferences_data()["cooking_history"].values())
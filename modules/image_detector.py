@@ -1,10 +1,11 @@
 
 import os
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 try:
     import cv2  
+    import numpy as np
 except ImportError:
     print("WARNING: opencv-python is not installed. Image detection will not work.")
     print("Install with: pip install opencv-python")
@@ -14,19 +15,28 @@ net = None
 LABELS = []
 
 
-def detect_ingredients(image_path: str) -> Tuple[List[str], str | None]:
+def _read_image(image: Union[str, bytes, "np.ndarray"]):
+    if isinstance(image, str):
+        return cv2.imread(image)
+    if isinstance(image, (bytes, bytearray)):
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return image
+
+
+def detect_ingredients(image: Union[str, bytes, "np.ndarray"]) -> Tuple[List[str], str | None]:
     
     if cv2 is None:
         return [], "OpenCV (cv2) library is not installed."
 
-    if not os.path.exists(image_path):
+    if isinstance(image, str) and not os.path.exists(image):
         return [], "Image file not found at path."
 
     
-    print(f"[image_detector STUB] Simulating model analysis for: {image_path}")
+    source = image if isinstance(image, str) else f"<{type(image).__name__} upload>"
+    print(f"[image_detector STUB] Simulating model analysis for: {source}")
     
     try:
-        img = cv2.imread(image_path)
+        img = _read_image(image)
         if img is None:
             return [], "Could not read image file. It may be corrupt."
             
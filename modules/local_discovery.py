@@ -1,8 +1,15 @@
+import functools
 import json
 import os
+from collections import defaultdict
 from typing import List, Dict, Any
 
-_DISH_DATABASE: List[Dict[str, Any]] = []
+from modules.snapshot import load_snapshot, save_snapshot
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 _DATA_PATH = os.path.join(
     os.path.dirname(__file__),
@@ -10,32 +17,45 @@ _DATA_PATH = os.path.join(
     'data',
     'local_dishes.json'
 )
+_SNAPSHOT_PATH = _DATA_PATH + '.pkl'
+
+@functools.lru_cache(maxsize=1)
+def _load_db() -> List[Dict[str, Any]]:
+    try:
+        if not os.path.exists(_DATA_PATH):
+            print(f" [local_discovery] WARNING: Could not find 'data/local_dishes.json'.")
+            print(f"Searched at path: {_DATA_PATH}")
+            return []
+
+        source_mtime = os.path.getmtime(_DATA_PATH)
+        dishes = load_snapshot(_SNAPSHOT_PATH, source_mtime)
+        if dishes is None:
+            if orjson is not None:
+                with open(_DATA_PATH, 'rb') as f:
+                    dishes = orjson.loads(f.read())
+            else:
+                with open(_DATA_PATH, 'r', encoding='utf-8') as f:
+                    dishes = json.load(f)
+            save_snapshot(_SNAPSHOT_PATH, source_mtime, dishes, label="local_discovery")
+
+        print(f" [local_discovery] Successfully loaded {len(dishes)} local dishes from JSON.")
+        return dishes
+
+    except Exception as e:
+        print(f" [local_discovery] CRITICAL ERROR loading 'data/local_dishes.json': {e}")
+        return []
 
-try:
-    if os.path.exists(_DATA_PATH):
-        with open(_DATA_PATH, 'r', encoding='utf-8') as f:
-            _DISH_DATABASE = json.load(f)
-        
-        print(f" [local_discovery] Successfully loaded {len(_DISH_DATABASE)} local dishes from JSON.")
-    
-    else:
-        print(f" [local_discovery] WARNING: Could not find 'data/local_dishes.json'.")
-        print(f"Searched at path: {_DATA_PATH}")
 
-except Exception as e:
-    print(f" [local_discovery] CRITICAL ERROR loading 'data/local_dishes.json': {e}")
-    _DISH_DATABASE = []
+@functools.lru_cache(maxsize=1)
+def _by_location() -> Dict[str, List[Dict[str, Any]]]:
+    index = defaultdict(list)
+    for dish in _load_db():
+        index[str(dish.get('location', '')).strip().lower()].append(dish)
+    return dict(index)
 
 
 def get_dishes_by_location(location: str) -> List[Dict[str, Any]]:
-    if not location or not _DISH_DATABASE:
+    if not location:
         return []
 
-    search_location = location.strip().lower()
-
-    results = [
-        dish for dish in _DISH_DATABASE
-        if str(dish.get('location', '')).strip().lower() == search_location
-    ]
-
-    return results
\ No newline at end of file
+    return list(_by_location().get(location.strip().lower(), []))
\ No newline at end of file
@@ -1,25 +1,42 @@
 import os
 import csv
+import functools
 import unicodedata
 import re
 from typing import Dict, Optional, List, Any
 
+from modules.snapshot import load_snapshot, save_snapshot
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_NUTRIENTS = ("calories", "protein", "carbs", "fat")
+
 _NUTRITION_DB: Dict[str, Dict[str, float]] = {}
+_NUTRITION_NAMES: Dict[str, int] = {}
+_NUTRITION_MAT = None
 
+_SNAPSHOT_VERSION = 2
 
-_NON_PRINTABLE_RE = re.compile(r"[\u200B\u200C\u200D\uFEFF]")
-_MULTI_SPACE_RE = re.compile(r"\s+")
+
+_TRANS = str.maketrans({
+    "\u200B": "", "\u200C": "", "\u200D": "", "\uFEFF": "",
+    "\u00A0": " ", "\u0085": " ", "\u1680": " ", "\u2028": " ", "\u2029": " "
+})
+_MULTI_SPACE_RE = re.compile(r"[ \t\n\r\f\v\x1c-\x1f]+", re.ASCII)
+_STRIP_CHARS = " \t\n\r\"'“”‘’.,;:()[]"
 
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         return ""
-    s = unicodedata.normalize("NFKC", text)
-    s = _NON_PRINTABLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")
-    s = s.strip()
-    s = _MULTI_SPACE_RE.sub(" ", s)
-    s = s.strip(" \t\n\r\"'“”‘’.,;:()[]")
-    return s.lower()
+    return _normalize_cached(text)
+
+@functools.lru_cache(maxsize=8192)
+def _normalize_cached(text: str) -> str:
+    s = unicodedata.normalize("NFKC", text).translate(_TRANS)
+    return _MULTI_SPACE_RE.sub(" ", s).strip(_STRIP_CHARS).lower()
 
 
 def load_nutrition_from_csv(file_path: str):
@@ -30,6 +47,15 @@ def load_nutrition_from_csv(file_path: str):
         print(f"ERROR [Nutrition]: Nutrition file not found at {file_path}. No nutrition data will be available.")
         return
 
+    snapshot_path = file_path + ".pkl"
+    source_mtime = os.path.getmtime(file_path)
+    cached = load_snapshot(snapshot_path, source_mtime, _SNAPSHOT_VERSION)
+    if cached is not None:
+        _NUTRITION_DB = cached
+        _build_matrix()
+        print(f"INFO [Nutrition]: Loaded nutrition database from snapshot {snapshot_path}.")
+        return
+
     print(f"INFO [Nutrition]: Loading nutrition database from {file_path}...")
     
     temp_db = {}
@@ -55,6 +81,7 @@ def load_nutrition_from_csv(file_path: str):
                 except KeyError:
                     print("ERROR [Nutrition]: CSV file must have columns: 'ingredient_name', 'calories_100g', 'protein_100g', 'carbs_100g', 'fat_100g'")
                     _NUTRITION_DB = {} 
+                    _build_matrix()
                     return
 
     except FileNotFoundError:
@@ -64,33 +91,37 @@ def load_nutrition_from_csv(file_path: str):
         print(f"ERROR [Nutrition]: Failed to read CSV file: {e}")
         return
 
+    _add_plural_aliases(temp_db)
     _NUTRITION_DB = temp_db
-    print(f"INFO [Nutrition]: Successfully loaded {len(_NUTRITION_DB)} items.")
+    _build_matrix()
+    save_snapshot(snapshot_path, source_mtime, _NUTRITION_DB, _SNAPSHOT_VERSION, label="Nutrition")
+    print(f"INFO [Nutrition]: Successfully loaded {count} items.")
+
+
+def _build_matrix():
+    global _NUTRITION_NAMES, _NUTRITION_MAT
+
+    _NUTRITION_NAMES = {name: row for row, name in enumerate(_NUTRITION_DB)}
+    if np is None:
+        _NUTRITION_MAT = None
+        return
+    _NUTRITION_MAT = np.array(
+        [[info[k] for k in _NUTRIENTS] for info in _NUTRITION_DB.values()],
+        dtype=np.float64
+    ).reshape(-1, len(_NUTRIENTS))
+
+
+def _add_plural_aliases(db: Dict[str, Dict[str, float]]):
+    for key in list(db):
+        db.setdefault(key + 's', db[key])
+        if key.endswith('s') and not key[:-1].endswith('s'):
+            db.setdefault(key[:-1], db[key])
 
 
 def lookup(ingredient: str) -> Optional[Dict[str, float]]:
     if not ingredient or not isinstance(ingredient, str):
         return None
-        
-    norm_key = normalize(ingredient)
-    
-    data = _NUTRITION_DB.get(norm_key)
-    if data:
-        return data
-        
-    if norm_key.endswith('s'):
-        singular_key = norm_key[:-1]
-        data = _NUTRITION_DB.get(singular_key)
-        if data:
-            return data
-            
-    if not norm_key.endswith('s'):
-        plural_key = norm_key + 's'
-        data = _NUTRITION_DB.get(plural_key)
-        if data:
-            return data
-
-    return None
+    return _NUTRITION_DB.get(normalize(ingredient))
 
 
 def summarize(ingredients: List[str]) -> Dict[str, float]:
@@ -98,6 +129,19 @@ def summarize(ingredients: List[str]) -> Dict[str, float]:
     totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
     if not ingredients:
         return totals
+
+    if _NUTRITION_MAT is not None:
+        rows = [
+            row for row in (
+                _NUTRITION_NAMES.get(normalize(ing))
+                for ing in ingredients if ing and isinstance(ing, str)
+            )
+            if row is not None
+        ]
+        if not rows:
+            return totals
+        vec = _NUTRITION_MAT[rows].sum(axis=0)
+        return dict(zip(_NUTRIENTS, vec.tolist()))
         
     for ing in ingredients:
         info = lookup(ing)
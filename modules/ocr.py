@@ -1,33 +1,43 @@
 
-from typing import List, Tuple, Optional, Set
+from typing import FrozenSet, List, Tuple, Optional, Set, Union
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import io
+import os
 import re
 import unicodedata
 from difflib import get_close_matches
 
 try:
     import cv2  
+    import numpy as np
 except Exception:
     cv2 = None  
 
 try:
     import pytesseract  
+    from PIL import Image
 except Exception:
     pytesseract = None 
 
+try:
+    from rapidfuzz import fuzz, process as rf_process
+except ImportError:
+    rf_process = None
+
 
-_NON_PRINTABLE_RE = re.compile(r"[\u200B\u200C\u200D\uFEFF]")
-_MULTI_SPACE_RE = re.compile(r"\s+")
+_TRANS = str.maketrans({
+    "\u200B": "", "\u200C": "", "\u200D": "", "\uFEFF": "",
+    "\u00A0": " ", "\u0085": " ", "\u1680": " ", "\u2028": " ", "\u2029": " "
+})
+_MULTI_SPACE_RE = re.compile(r"[ \t\n\r\f\v\x1c-\x1f]+", re.ASCII)
+_STRIP_CHARS = " \t\n\r\"'“”‘’.,;:()[]"
 
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         return ""
-    s = unicodedata.normalize("NFKC", text)
-    s = _NON_PRINTABLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")
-    s = s.strip()
-    s = _MULTI_SPACE_RE.sub(" ", s)
-    s = s.strip(" \t\n\r\"'“”‘’.,;:()[]")
-    return s.lower()
+    s = unicodedata.normalize("NFKC", text).translate(_TRANS)
+    return _MULTI_SPACE_RE.sub(" ", s).strip(_STRIP_CHARS).lower()
 
 
 KNOWN_INGREDIENTS_BASE = {
@@ -39,6 +49,8 @@ KNOWN_INGREDIENTS_BASE = {
     "green chilli", "green chilies", "green chillies"
 }
 
+_KNOWN_BASE = frozenset(normalize(k) for k in KNOWN_INGREDIENTS_BASE)
+
 STOPWORDS = {
     "mrp", "amount", "subtotal", "tax", "total", "balance", "cash", "tender",
     "qty", "quantity", "price", "rs", "usd", "inr", "each", "pcs", "pc",
@@ -81,32 +93,52 @@ PLURAL_MAP = {
 }
 
 
+_OCR_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="ocr")
+
 def libs_available() -> Tuple[bool, bool]:
     return (cv2 is not None, pytesseract is not None)
 
-def preprocess_image(path: str):
+ImageSource = Union[str, bytes, "np.ndarray"]
+
+def _read_image(image: ImageSource):
+    if isinstance(image, str):
+        return cv2.imread(image)
+    if isinstance(image, (bytes, bytearray)):
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return image
+
+def preprocess_image(image: ImageSource, high_quality: bool = False):
     if cv2 is None:
         return None
-    img = cv2.imread(path)
+    img = _read_image(image)
     if img is None:
         return None
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     h, w = gray.shape[:2]
+    if max(h, w) > 2000:
+        down = 2000 / max(h, w)
+        gray = cv2.resize(gray, None, fx=down, fy=down, interpolation=cv2.INTER_AREA)
+        h, w = gray.shape[:2]
     scale = 2 if max(h, w) < 1000 else 1
     if scale != 1:
         gray = cv2.resize(gray, (w * scale, h * scale), interpolation=cv2.INTER_CUBIC)
-    gray = cv2.bilateralFilter(gray, 9, 75, 75)
+    if high_quality:
+        gray = cv2.bilateralFilter(gray, 9, 75, 75)
+    else:
+        gray = cv2.GaussianBlur(gray, (3, 3), 0)
     _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     return th
 
-def ocr_extract_text(image_path: str) -> Optional[str]:
+def ocr_extract_text(image: ImageSource, high_quality: bool = False) -> Optional[str]:
     if pytesseract is None:
         return None
     try:
-        pre = preprocess_image(image_path)
+        pre = preprocess_image(image, high_quality=high_quality)
         if pre is not None and cv2 is not None:
             return pytesseract.image_to_string(pre)
-        return pytesseract.image_to_string(image_path)
+        if isinstance(image, (bytes, bytearray)):
+            image = Image.open(io.BytesIO(image))
+        return pytesseract.image_to_string(image)
     except Exception as e:
         print(f"Error during Tesseract OCR: {e}")
         return None
@@ -130,16 +162,30 @@ def _strip_units_prices_noise(s: str) -> str:
     s = re.sub(r"\s+", " ", s).strip()
     return s
 
-def _drop_stopwords_tokens(tokens: List[str]) -> List[str]:
-    return [t for t in tokens if t and t not in STOPWORDS and len(t) > 1]
+@functools.lru_cache(maxsize=8)
+def _known_choices(known_db: FrozenSet[str]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    known = _KNOWN_BASE | known_db
+    return known, tuple(sorted(known))
+
+def _closest_known(cand: str, choices: Tuple[str, ...]) -> Optional[str]:
+    if rf_process is not None:
+        match = rf_process.extractOne(cand, choices, scorer=fuzz.ratio, score_cutoff=84)
+        return match[0] if match else None
+    match = get_close_matches(cand, choices, n=1, cutoff=0.84)
+    return match[0] if match else None
+
+@functools.lru_cache(maxsize=4096)
+def _canonical_token(raw: str) -> str:
+    token = normalize(raw)
+    if not token or token in STOPWORDS or len(token) <= 1:
+        return ""
+    return _plural_to_singular_token(token)
 
 def parse_text_to_ingredients(raw_text: str, known_db: Optional[Set[str]] = None) -> List[str]:
     if not raw_text:
         return []
 
-    known = {normalize(k) for k in KNOWN_INGREDIENTS_BASE}
-    if known_db:
-        known |= {normalize(k) for k in known_db}
+    known, known_choices = _known_choices(frozenset(known_db or ()))
 
     chunks: List[str] = []
     for line in raw_text.splitlines():
@@ -155,13 +201,11 @@ def parse_text_to_ingredients(raw_text: str, known_db: Optional[Set[str]] = None
     cleaned: List[str] = []
     for ch in chunks:
         ch = ch.replace("chilli", "chili") 
-        tokens = [normalize(t) for t in ch.split()]
-        tokens = _drop_stopwords_tokens(tokens)
+        tokens = [t for t in map(_canonical_token, ch.split()) if t]
         if not tokens:
             continue
 
-        cand = " ".join(_plural_to_singular_token(t) for t in tokens)
-        cand = normalize(cand) 
+        cand = normalize(" ".join(tokens))
 
         if not cand or cand in STOPWORDS:
             continue
@@ -171,9 +215,9 @@ def parse_text_to_ingredients(raw_text: str, known_db: Optional[Set[str]] = None
             cleaned.append(cand)
             continue
 
-        match = get_close_matches(cand, list(known), n=1, cutoff=0.84)
+        match = _closest_known(cand, known_choices)
         if match:
-            cleaned.append(match[0])
+            cleaned.append(match)
             continue
 
         if re.fullmatch(r"[a-z][a-z\s]+", cand) and len(cand) >= 3:
@@ -187,8 +231,9 @@ def parse_text_to_ingredients(raw_text: str, known_db: Optional[Set[str]] = None
             result.append(x)
     return result
 
-def image_to_ingredient_list(image_path: str, known_db: Optional[Set[str]] = None) -> Tuple[List[str], Optional[str]]:
-    text = ocr_extract_text(image_path)
+def image_to_ingredient_list(image: ImageSource, known_db: Optional[Set[str]] = None,
+                             high_quality: bool = False) -> Tuple[List[str], Optional[str]]:
+    text = _OCR_POOL.submit(ocr_extract_text, image, high_quality).result()
     if text is None:
         if pytesseract is None:
             return [], "OCR libraries not available. Install 'pytesseract' and the Tesseract-OCR engine."
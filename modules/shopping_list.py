@@ -1,8 +1,19 @@
 import json
 import os
+import re
 from typing import List, Dict, Any, Set
 from collections import defaultdict
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 _LIST_PATH = os.path.join(_DATA_DIR, "shopping_list_cache.json")
 os.makedirs(_DATA_DIR, exist_ok=True)
@@ -30,18 +41,38 @@ _CATEGORIES = {
 }
 _DEFAULT_CATEGORY = "Other"
 
+_KEYWORD_TO_CAT = {kw: cat for cat, kws in _CATEGORIES.items() for kw in kws}
+
+if ahocorasick is not None:
+    _AUTOMATON = ahocorasick.Automaton()
+    for rank, (kw, cat) in enumerate(_KEYWORD_TO_CAT.items()):
+        _AUTOMATON.add_word(kw, (rank, cat))
+    _AUTOMATON.make_automaton()
+    _CAT_PATTERNS = []
+else:
+    _AUTOMATON = None
+    _CAT_PATTERNS = [
+        (cat, re.compile("|".join(re.escape(kw) for kw in kws)))
+        for cat, kws in _CATEGORIES.items()
+    ]
+
 def _find_category(ingredient: str) -> str:
     ing_lower = ingredient.lower()
-    for category, keywords in _CATEGORIES.items():
-        for keyword in keywords:
-            if keyword in ing_lower:
-                return category
+    if _AUTOMATON is not None:
+        best = min((hit for _, hit in _AUTOMATON.iter(ing_lower)), default=None)
+        return best[1] if best else _DEFAULT_CATEGORY
+    for category, pattern in _CAT_PATTERNS:
+        if pattern.search(ing_lower):
+            return category
     return _DEFAULT_CATEGORY
 
 def load_list() -> Dict[str, List[str]]:
     if not os.path.exists(_LIST_PATH):
         return {}
     try:
+        if orjson is not None:
+            with open(_LIST_PATH, 'rb') as f:
+                return orjson.loads(f.read())
         with open(_LIST_PATH, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
@@ -50,8 +81,12 @@ def load_list() -> Dict[str, List[str]]:
 
 def save_list(shopping_list: Dict[str, List[str]]):
     try:
+        if orjson is not None:
+            with open(_LIST_PATH, 'wb') as f:
+                f.write(orjson.dumps(shopping_list, option=orjson.OPT_NON_STR_KEYS))
+            return
         with open(_LIST_PATH, 'w', encoding='utf-8') as f:
-            json.dump(shopping_list, f, indent=2, ensure_ascii=False)
+            json.dump(shopping_list, f, ensure_ascii=False, separators=(",", ":"))
     except Exception as e:
         print(f"Error: Could not save shopping list: {e}")
 
@@ -0,0 +1,35 @@
+import os
+import pickle
+import tempfile
+from typing import Any, Optional
+
+
+def load_snapshot(snapshot_path: str, source_key, version: Optional[int] = None):
+    try:
+        with open(snapshot_path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("key") != source_key:
+        return None
+    if snapshot.get("version") != version:
+        return None
+    return snapshot.get("data")
+
+
+def save_snapshot(snapshot_path: str, source_key, data: Any, version: Optional[int] = None,
+                  label: str = "Snapshot"):
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(snapshot_path) + ".",
+            suffix=".tmp",
+            dir=os.path.dirname(snapshot_path) or "."
+        )
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"data": data, "key": source_key, "version": version}, f, protocol=5)
+        os.replace(tmp_path, snapshot_path)
+    except Exception as e:
+        print(f"WARN [{label}]: Could not write snapshot {snapshot_path}: {e}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,24 +1,30 @@
 import os
 import json
+import functools
 import unicodedata
 import re
 from typing import List, Dict, Set, Any
 
+from modules.snapshot import load_snapshot, save_snapshot
+
 _SUB_MAP: Dict[str, List[str]] = {}
 
-_NON_PRINTABLE_RE = re.compile(r"[\u200B\u200C\u200D\uFEFF]")
-_MULTI_SPACE_RE = re.compile(r"\s+")
+_TRANS = str.maketrans({
+    "\u200B": "", "\u200C": "", "\u200D": "", "\uFEFF": "",
+    "\u00A0": " ", "\u0085": " ", "\u1680": " ", "\u2028": " ", "\u2029": " "
+})
+_MULTI_SPACE_RE = re.compile(r"[ \t\n\r\f\v\x1c-\x1f]+", re.ASCII)
+_STRIP_CHARS = " \t\n\r\"'“”‘’.,;:()[]"
 
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         return ""
-    s = unicodedata.normalize("NFKC", text)
-    s = _NON_PRINTABLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")
-    s = s.strip()
-    s = _MULTI_SPACE_RE.sub(" ", s)
-    s = s.strip(" \t\n\r\"'“”‘’.,;:()[]")
-    return s.lower()
+    return _normalize_cached(text)
+
+@functools.lru_cache(maxsize=8192)
+def _normalize_cached(text: str) -> str:
+    s = unicodedata.normalize("NFKC", text).translate(_TRANS)
+    return _MULTI_SPACE_RE.sub(" ", s).strip(_STRIP_CHARS).lower()
 
 def load_substitutions_from_json(file_path: str):
     global _SUB_MAP
@@ -27,6 +33,14 @@ def load_substitutions_from_json(file_path: str):
         print(f"ERROR [Substitutes]: File not found at {file_path}. No substitutions will be available.")
         return
 
+    snapshot_path = file_path + ".pkl"
+    source_mtime = os.path.getmtime(file_path)
+    cached = load_snapshot(snapshot_path, source_mtime)
+    if cached is not None:
+        _SUB_MAP = cached
+        print(f"INFO [Substitutes]: Loaded {len(_SUB_MAP)} substitution rules from snapshot {snapshot_path}.")
+        return
+
     print(f"INFO [Substitutes]: Loading substitutions database from {file_path}...")
     
     try:
@@ -40,6 +54,7 @@ def load_substitutions_from_json(file_path: str):
                 temp_db[norm_key] = norm_values
                 
             _SUB_MAP = temp_db
+            save_snapshot(snapshot_path, source_mtime, _SUB_MAP, label="Substitutes")
             print(f"INFO [Substitutes]: Successfully loaded {len(_SUB_MAP)} substitution rules.")
 
     except FileNotFoundError:
@@ -57,24 +72,12 @@ def suggest_substitutes(missing: List[str], available: Set[str]) -> Dict[str, Li
     avail_lower = {normalize(a) for a in available}
     
     for miss in missing:
-        miss_l = normalize(miss)
+        subs = _SUB_MAP.get(normalize(miss), ())
+        provided = avail_lower.intersection(subs)
         
-        candidates = [] 
-        provided = [] 
-        
-        subs = _SUB_MAP.get(miss_l, [])
-        
-        for s in subs:
-            if s in avail_lower:
-                provided.append(s)
-            else:
-                candidates.append(s)
-                
         if provided:
-            out[miss] = provided
-        elif candidates:
-            out[miss] = candidates
+            out[miss] = [s for s in subs if s in provided]
         else:
-            out[miss] = []
+            out[miss] = list(subs)
             
     return out
\ No newline at end of file
@@ -1,103 +1,473 @@
-from typing import List, Dict, Any, Optional, Set
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+import functools
+import heapq
 import json
+import multiprocessing
 import os
 import unicodedata
 import re
 from collections import defaultdict
-import modules.nutrition as nutrition_module_local
-import modules.substitutes as submod_local
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from modules.snapshot import load_snapshot, save_snapshot
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, FrozenSet, List, Optional, Set, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_TRANS = str.maketrans({
+    "\u200B": "", "\u200C": "", "\u200D": "", "\uFEFF": "",
+    "\u00A0": " ", "\u0085": " ", "\u1680": " ", "\u2028": " ", "\u2029": " "
+})
+_MULTI_SPACE_RE = re.compile(r"[ \t\n\r\f\v\x1c-\x1f]+", re.ASCII)
+_STRIP_CHARS = " \t\n\r\"'“”‘’.,;:()[]"
 
-_NON_PRINTABLE_RE = re.compile(r"[\u200B\u200C\u200D\uFEFF]")
-_MULTI_SPACE_RE = re.compile(r"\s+")
+_SNAPSHOT_VERSION = 1
+_PARALLEL_LOAD_MIN = 1000
 
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         return ""
-    s = unicodedata.normalize("NFKC", text)
-    s = _NON_PRINTABLE_RE.sub("", s)
-    s = s.replace("\u00A0", " ")
-    s = s.strip()
-    s = _MULTI_SPACE_RE.sub(" ", s)
-    s = s.strip(" \t\n\r\"'“”‘’.,;:()[]")
-    return s.lower()
+    return _normalize_cached(text)
+
+@functools.lru_cache(maxsize=1 << 16)
+def _normalize_cached(text: str) -> str:
+    s = text if text.isascii() else unicodedata.normalize("NFKC", text).translate(_TRANS)
+    return _MULTI_SPACE_RE.sub(" ", s).strip(_STRIP_CHARS).lower()
+
+def _normalize_one_recipe(rec: Dict[str, Any]) -> Dict[str, Any]:
+    title = rec.get("title", "Untitled Recipe")
+    ings = [normalize(i) for i in rec.get("ingredients", [])]
+    steps = rec.get("steps", [])
+    image_url = rec.get("image_url", "")
+
+    cuisine = normalize(rec.get("cuisine", "")) if rec.get("cuisine") else ""
+    diet = [normalize(d) for d in rec.get("diet", [])] if isinstance(rec.get("diet"), list) else []
+    time_min = rec.get("time", rec.get("cook_time", 0)) or 0
+    skill = normalize(rec.get("skill", "intermediate"))
+    servings = int(rec.get("servings", 1) or 1)
+    taste_tags = [normalize(t) for t in rec.get("taste_tags", [])] if rec.get("taste_tags") else []
+
+    return {
+        "title": title,
+        "ingredients": ings,
+        "steps": steps,
+        "image_url": image_url,
+        "cuisine": cuisine,
+        "diet": diet,
+        "time": int(time_min),
+        "skill": skill,
+        "servings": servings,
+        "taste_tags": taste_tags
+    }
 
 def load_recipes(file_path: str) -> List[Dict[str, Any]]:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Recipes file not found: {file_path}")
+
+    snapshot_path = file_path + ".cache.pkl"
+    source_key = (os.path.getmtime(file_path), os.path.getsize(file_path))
+    cached = load_snapshot(snapshot_path, source_key, _SNAPSHOT_VERSION)
+    if cached is not None:
+        normalized = [_prepare_recipe(rec) for rec in cached["recipes"]]
+        _register_corpus(normalized, cached["state"])
+        return normalized
+
     with open(file_path, "r", encoding="utf-8") as f:
         data = json.load(f)
         
-    normalized = []
-    for rec in data:
-        title = rec.get("title", "Untitled Recipe")
-        ings = [normalize(i) for i in rec.get("ingredients", [])]
-        steps = rec.get("steps", [])
-        image_url = rec.get("image_url", "")
-        
-        cuisine = normalize(rec.get("cuisine", "")) if rec.get("cuisine") else ""
-        diet = [normalize(d) for d in rec.get("diet", [])] if isinstance(rec.get("diet"), list) else []
-        time_min = rec.get("time", rec.get("cook_time", 0)) or 0
-        skill = normalize(rec.get("skill", "intermediate"))
-        servings = int(rec.get("servings", 1) or 1)
-        taste_tags = [normalize(t) for t in rec.get("taste_tags", [])] if rec.get("taste_tags") else []
-        
-        normalized.append({
-            "title": title,
-            "ingredients": ings,
-            "steps": steps,
-            "image_url": image_url,
-            "cuisine": cuisine,
-            "diet": diet,
-            "time": int(time_min),
-            "skill": skill,
-            "servings": servings,
-            "taste_tags": taste_tags
-        })
+    in_child = multiprocessing.parent_process() is not None
+    records = None
+    workers = os.cpu_count() or 1
+    if len(data) > _PARALLEL_LOAD_MIN and workers > 1 and not in_child:
+        try:
+            ctx = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as ex:
+                records = list(ex.map(_normalize_one_recipe, data, chunksize=128))
+        except Exception:
+            records = None
+    if records is None:
+        records = [_normalize_one_recipe(rec) for rec in data]
+
+    normalized = [_prepare_recipe(rec) for rec in records]
+    state = _warm_corpus(normalized)
+    if not in_child:
+        public = [{k: v for k, v in r.items() if not k.startswith("_")} for r in normalized]
+        save_snapshot(
+            snapshot_path, source_key, {"recipes": public, "state": state},
+            _SNAPSHOT_VERSION, label="Suggestor"
+        )
     return normalized
 
+def _prepare_recipe(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    ing_set = frozenset(recipe.get("ingredients", []))
+    recipe["_ing_set"] = ing_set
+    recipe["_total"] = len(ing_set)
+    recipe["_cuisine"] = (recipe.get("cuisine") or "").lower()
+    recipe["_diet_set"] = frozenset(d.lower() for d in (recipe.get("diet") or []))
+    recipe["_taste_set"] = frozenset(recipe.get("taste_tags") or [])
+    recipe["_skill_rank"] = _skill_to_rank(recipe.get("skill") or "intermediate")
+    return recipe
+
+_CORPUS_CACHE: Dict[int, Any] = {}
+_CORPUS_CACHE_SIZE = 4
+
+def _corpus_bits(recipes: List[Dict[str, Any]], state: Dict[str, Any]):
+    if "bits" not in state:
+        vocab: Dict[str, int] = {}
+        state["bits"] = [
+            sum(1 << vocab.setdefault(ing, len(vocab)) for ing in recipe["_ing_set"])
+            for recipe in recipes
+        ]
+        state["vocab"] = vocab
+    return state["vocab"], state["bits"]
+
+def _register_corpus(recipes: List[Dict[str, Any]], state: Dict[str, Any]) -> Dict[str, Any]:
+    _CORPUS_CACHE.pop(id(recipes), None)
+    if len(_CORPUS_CACHE) >= _CORPUS_CACHE_SIZE:
+        _CORPUS_CACHE.pop(next(iter(_CORPUS_CACHE)))
+    _CORPUS_CACHE[id(recipes)] = (recipes, len(recipes), state)
+    return state
+
+def _corpus_state(recipes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    cached = _CORPUS_CACHE.get(id(recipes))
+    if cached is None or cached[0] is not recipes or cached[1] != len(recipes):
+        for recipe in recipes:
+            if "_ing_set" not in recipe:
+                _prepare_recipe(recipe)
+        return _register_corpus(recipes, {})
+    return cached[2]
+
+def _warm_corpus(recipes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    state = _corpus_state(recipes)
+    if "index" not in state:
+        state["index"] = build_index(recipes)
+    _corpus_bits(recipes, state)
+    if np is not None and "arrays" not in state:
+        state["arrays"] = build_corpus_arrays(recipes)
+    return state
+
+def _match_recipe(
+    recipe: Dict[str, Any],
+    user_set: Set[str],
+    threshold: float
+) -> Optional[Dict[str, Any]]:
+    recipe_set = recipe["_ing_set"]
+    total = recipe["_total"]
+    if total == 0:
+        return None
+    matched = user_set & recipe_set
+    match_count = len(matched)
+    ratio = match_count / total
+    if ratio < threshold:
+        return None
+    missing = recipe_set - user_set
+    return {
+        "title": recipe["title"],
+        "image_url": recipe.get("image_url", ""),
+        "match_count": match_count,
+        "total_required": total,
+        "match_ratio": ratio,
+        "matched": matched,
+        "missing": missing,
+        "ingredients": list(recipe_set),
+        "steps": recipe.get("steps", [])
+    }
+
+def prepare_user_set(user_ingredients: Union[List[str], FrozenSet[str]]) -> FrozenSet[str]:
+    if isinstance(user_ingredients, frozenset):
+        return user_ingredients
+    return _prepare_user_set_cached(frozenset(i for i in user_ingredients if isinstance(i, str)))
+
+@functools.lru_cache(maxsize=128)
+def _prepare_user_set_cached(items: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(n for n in map(normalize, items) if n)
+
+def _rank_suggestions(suggestions: List[Dict[str, Any]], top_n: Optional[int]) -> List[Dict[str, Any]]:
+    key = lambda x: (x["match_ratio"], x["match_count"])
+    if top_n is None:
+        suggestions.sort(key=key, reverse=True)
+    else:
+        suggestions = heapq.nlargest(top_n, suggestions, key=key)
+    for s in suggestions:
+        s["matched"] = sorted(s["matched"])
+        s["missing"] = sorted(s["missing"])
+    return suggestions
+
 def suggest_recipes(
-    user_ingredients: List[str],
+    user_ingredients: Union[List[str], FrozenSet[str]],
     recipes: List[Dict[str, Any]],
-    threshold: float = 0.6
+    threshold: float = 0.6,
+    top_n: Optional[int] = None
 ) -> List[Dict[str, Any]]:
-    user_set = set(normalize(i) for i in user_ingredients if normalize(i))
+    _corpus_state(recipes)
+    user_set = prepare_user_set(user_ingredients)
     suggestions = []
     for recipe in recipes:
-        recipe_set = set(recipe.get("ingredients", []))
-        total = len(recipe_set)
-        if total == 0:
-            continue
-        matched = sorted(list(user_set & recipe_set))
-        missing = sorted(list(recipe_set - user_set))
-        match_count = len(matched)
-        ratio = match_count / total
-        if ratio >= threshold:
-            suggestions.append({
-                "title": recipe["title"],
-                "image_url": recipe.get("image_url", ""),
-                "match_count": match_count,
-                "total_required": total,
-                "match_ratio": ratio,
-                "matched": matched,
-                "missing": missing,
-                "ingredients": list(recipe_set),
-                "steps": recipe.get("steps", [])
-            })
-    suggestions.sort(key=lambda x: (x["match_ratio"], x["match_count"]), reverse=True)
-    return suggestions
+        suggestion = _match_recipe(recipe, user_set, threshold)
+        if suggestion is not None:
+            suggestions.append(suggestion)
+    return _rank_suggestions(suggestions, top_n)
 
-def _skill_to_rank(skill: str) -> int:
-    mapping = {"beginner": 1, "intermediate": 2, "expert": 3}
-    return mapping.get(skill.lower(), 2)
+def build_index(recipes: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    index = defaultdict(list)
+    for rid, recipe in enumerate(recipes):
+        for ing in set(recipe.get("ingredients", [])):
+            index[ing].append(rid)
+    return index
+
+def suggest_recipes_indexed(
+    user_ingredients: Union[List[str], FrozenSet[str]],
+    recipes: List[Dict[str, Any]],
+    index: Optional[Dict[str, List[int]]] = None,
+    threshold: float = 0.6,
+    top_n: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    if threshold <= 0:
+        return suggest_recipes(user_ingredients, recipes, threshold, top_n)
+    state = _corpus_state(recipes)
+    if index is None:
+        if "index" not in state:
+            state["index"] = build_index(recipes)
+        index = state["index"]
+    user_set = prepare_user_set(user_ingredients)
+    candidates = set().union(*[index.get(i, ()) for i in user_set])
+    suggestions = []
+    for rid in sorted(candidates):
+        suggestion = _match_recipe(recipes[rid], user_set, threshold)
+        if suggestion is not None:
+            suggestions.append(suggestion)
+    return _rank_suggestions(suggestions, top_n)
 
-def _safe_div(a: float, b: float) -> float:
+@dataclass
+class CorpusArrays:
+    vocab: Dict[str, int]
+    ing_indices: Any
+    ing_owner: Any
+    totals: Any
+    times: Any
+    skills: Any
+    cuisines: Any
+    cuisine_vocab: Dict[str, int]
+    diet_matrix: Any
+    diet_vocab: Dict[str, int]
+    taste_matrix: Any
+    taste_vocab: Dict[str, int]
+
+def _incidence(cells: List[tuple], rows: int, cols: int):
+    matrix = np.zeros((rows, cols), dtype=bool)
+    if cells:
+        r, c = zip(*cells)
+        matrix[list(r), list(c)] = True
+    return matrix
+
+def build_corpus_arrays(recipes: List[Dict[str, Any]]) -> CorpusArrays:
+    _corpus_state(recipes)
+    vocab: Dict[str, int] = {}
+    cuisine_vocab: Dict[str, int] = {}
+    diet_vocab: Dict[str, int] = {}
+    taste_vocab: Dict[str, int] = {}
+    ing_indices, ing_owner, cuisines, diet_cells, taste_cells = [], [], [], [], []
+    for rid, recipe in enumerate(recipes):
+        for ing in recipe["_ing_set"]:
+            ing_indices.append(vocab.setdefault(ing, len(vocab)))
+            ing_owner.append(rid)
+        cuisines.append(cuisine_vocab.setdefault(recipe["_cuisine"], len(cuisine_vocab)))
+        for d in recipe["_diet_set"]:
+            diet_cells.append((rid, diet_vocab.setdefault(d, len(diet_vocab))))
+        for t in recipe["_taste_set"]:
+            taste_cells.append((rid, taste_vocab.setdefault(t, len(taste_vocab))))
+
+    n = len(recipes)
+    return CorpusArrays(
+        vocab=vocab,
+        ing_indices=np.array(ing_indices, dtype=np.int64),
+        ing_owner=np.array(ing_owner, dtype=np.int64),
+        totals=np.fromiter((r["_total"] for r in recipes), dtype=np.int64, count=n),
+        times=np.fromiter((int(r.get("time", 0) or 0) for r in recipes), dtype=np.int64, count=n),
+        skills=np.fromiter((r["_skill_rank"] for r in recipes), dtype=np.int8, count=n),
+        cuisines=np.array(cuisines, dtype=np.int32),
+        cuisine_vocab=cuisine_vocab,
+        diet_matrix=_incidence(diet_cells, n, len(diet_vocab)),
+        diet_vocab=diet_vocab,
+        taste_matrix=_incidence(taste_cells, n, len(taste_vocab)),
+        taste_vocab=taste_vocab
+    )
+
+_WEIGHT_KEYS = ("ingredient", "cuisine", "taste", "diet", "time", "skill", "missing_penalty")
+
+def _score_kernel_numpy(match_counts, totals, cuisine_eq, taste_eq, diet_eq, times, skills, max_time, user_skill, w):
+    total = np.maximum(totals, 1)
+    ratios = match_counts / total
+    if max_time:
+        over = np.maximum(0, times - max_time) / max(1, max_time)
+        time_score = np.where(times != 0, np.maximum(0.0, 1.0 - over), 1.0)
+    else:
+        time_score = np.ones(len(times), dtype=np.float64)
+    skill_score = np.where(user_skill >= skills, 1.0, user_skill / skills)
+    missing_pen = (totals - match_counts) / total
+    return (
+        w[0] * ratios +
+        w[1] * cuisine_eq +
+        w[2] * taste_eq +
+        w[3] * diet_eq +
+        w[4] * time_score +
+        w[5] * skill_score
+    ) - (w[6] * missing_pen)
+
+@functools.lru_cache(maxsize=1)
+def _score_kernel():
     try:
-        return (a / b) if b else 0.0
-    except Exception:
-        return 0.0
+        from numba import njit
+    except ImportError:
+        return _score_kernel_numpy
+
+    @njit(cache=True)
+    def _score_loop(match_counts, totals, cuisine_eq, taste_eq, diet_eq, times, skills, max_time, user_skill, w):
+        n = totals.shape[0]
+        scores = np.empty(n, dtype=np.float64)
+        for i in range(n):
+            total = max(totals[i], 1)
+            ratio = match_counts[i] / total
+            time_score = 1.0
+            if max_time and times[i]:
+                time_score = max(0.0, 1.0 - max(0, times[i] - max_time) / max(1, max_time))
+            skill_score = 1.0 if user_skill >= skills[i] else user_skill / skills[i]
+            missing_pen = (totals[i] - match_counts[i]) / total
+            scores[i] = (
+                w[0] * ratio +
+                w[1] * cuisine_eq[i] +
+                w[2] * taste_eq[i] +
+                w[3] * diet_eq[i] +
+                w[4] * time_score +
+                w[5] * skill_score
+            ) - (w[6] * missing_pen)
+        return scores
+
+    return _score_loop
+
+def _column_score(matrix, vocab: Dict[Any, int], key: str):
+    if not key:
+        return np.ones(matrix.shape[0], dtype=np.float64)
+    col = vocab.get(key)
+    if col is None:
+        return np.zeros(matrix.shape[0], dtype=np.float64)
+    return matrix[:, col].astype(np.float64)
+
+def _rank_arrays(
+    arrays: CorpusArrays,
+    user_set: Set[str],
+    prefs_cuisine: str,
+    prefs_taste: str,
+    prefs_diet: str,
+    prefs_allergies: Set[str],
+    prefs_max_time: int,
+    prefs_skill: str,
+    w: Dict[str, float],
+    top_n: int
+):
+    n = len(arrays.totals)
+    vocab = arrays.vocab
+
+    user_mask = np.zeros(len(vocab), dtype=bool)
+    user_mask[[vocab[i] for i in user_set if i in vocab]] = True
+    match_counts = np.bincount(
+        arrays.ing_owner, weights=user_mask[arrays.ing_indices], minlength=n
+    ).astype(np.int64)
+
+    if prefs_cuisine:
+        cuisine_eq = (arrays.cuisines == arrays.cuisine_vocab.get(prefs_cuisine, -1)).astype(np.float64)
+    else:
+        cuisine_eq = np.ones(n, dtype=np.float64)
+
+    scores = _score_kernel()(
+        match_counts, arrays.totals, cuisine_eq,
+        _column_score(arrays.taste_matrix, arrays.taste_vocab, prefs_taste),
+        _column_score(arrays.diet_matrix, arrays.diet_vocab, prefs_diet),
+        arrays.times, arrays.skills, prefs_max_time, _skill_to_rank(prefs_skill),
+        np.array([w[k] for k in _WEIGHT_KEYS], dtype=np.float64)
+    )
+    totals = np.maximum(arrays.totals, 1)
+    ratios = match_counts / totals
+
+    keep = scores > 0.0
+    allergen_re = _allergen_pattern(prefs_allergies)
+    if allergen_re is not None:
+        allergic = np.fromiter((allergen_re.search(ing) is not None for ing in vocab), dtype=bool, count=len(vocab))
+        blocked = np.bincount(arrays.ing_owner, weights=allergic[arrays.ing_indices], minlength=n) > 0
+        keep &= ~blocked
+
+    idx = np.flatnonzero(keep)
+    top_n = max(top_n, 0)
+    if top_n < len(idx):
+        cut = len(idx) - top_n
+        floor = np.partition(scores[idx], cut)[cut] if top_n else np.inf
+        idx = idx[scores[idx] >= floor]
+    order = idx[np.lexsort((-match_counts[idx], -ratios[idx], -scores[idx]))]
+    return order[:top_n], scores, ratios, match_counts, totals
+
+def _advanced_result(
+    recipe: Dict[str, Any],
+    user_set: Set[str],
+    score: float,
+    match_ratio: float,
+    match_count: int,
+    total: int,
+    nm,
+    smod
+) -> Dict[str, Any]:
+    recipe_ings = recipe["_ing_set"]
+    matched = sorted(user_set & recipe_ings)
+    missing = sorted(recipe_ings - user_set)
+    return {
+        "title": recipe.get("title"),
+        "image_url": recipe.get("image_url", ""),
+        "score": score,
+        "matched": matched,
+        "missing": missing,
+        "match_ratio": match_ratio,
+        "match_count": match_count,
+        "total_required": total,
+        "ingredients": list(recipe_ings),
+        "steps": recipe.get("steps", []),
+        "nutrition": _compute_recipe_nutrition(recipe, nm),
+        "substitutes": _substitutes_for(smod, frozenset(missing), user_set),
+        "meta": {
+            "cuisine": recipe.get("cuisine", ""),
+            "diet": recipe.get("diet", []),
+            "time": recipe.get("time", 0),
+            "skill": recipe.get("skill", "intermediate"),
+            "servings": recipe.get("servings", 1),
+            "taste_tags": recipe.get("taste_tags", [])
+        }
+    }
+
+def _allergen_pattern(allergies: Set[str]):
+    allergens = sorted(a for a in allergies if a)
+    if not allergens:
+        return None
+    return re.compile("|".join(re.escape(a) for a in allergens), re.ASCII)
+
+_SKILL_RANKS = {"beginner": 1, "intermediate": 2, "expert": 3}
+
+def _skill_to_rank(skill: str) -> int:
+    return _SKILL_RANKS.get(skill.lower(), 2)
 
 def _compute_recipe_nutrition(recipe: Dict[str, Any], nutrition_module) -> Dict[str, float]:
-    nm = nutrition_module or nutrition_module_local
+    if nutrition_module is None:
+        from modules import nutrition as nutrition_module
+    nm = nutrition_module
+    table = getattr(nm, "_NUTRITION_DB", nm)
+    cached = recipe.get("_nutrition")
+    if cached is not None and cached[0] is table:
+        return dict(cached[1])
     totals = {"calories": 0.0, "protein": 0.0, "carbs": 0.0, "fat": 0.0}
     for ing in recipe.get("ingredients", []):
         info = nm.lookup(ing)
@@ -108,10 +478,25 @@ def _compute_recipe_nutrition(recipe: Dict[str, Any], nutrition_module) -> Dict[
             
     servings = int(recipe.get("servings", 1) or 1)
     per_serving = {k: (totals[k] / servings) for k in totals}
-    return per_serving
+    recipe["_nutrition"] = (table, per_serving)
+    return dict(per_serving)
+
+@functools.lru_cache(maxsize=4096)
+def _cached_substitutes(smod, missing: FrozenSet[str], available: FrozenSet[str]) -> Dict[str, List[str]]:
+    return smod.suggest_substitutes(sorted(missing), available)
+
+_SUBSTITUTES_TABLE = None
+
+def _substitutes_for(smod, missing: FrozenSet[str], available: FrozenSet[str]) -> Dict[str, List[str]]:
+    global _SUBSTITUTES_TABLE
+    table = getattr(smod, "_SUB_MAP", smod)
+    if _SUBSTITUTES_TABLE is not table:
+        _cached_substitutes.cache_clear()
+        _SUBSTITUTES_TABLE = table
+    return {k: list(v) for k, v in _cached_substitutes(smod, missing, available).items()}
 
 def advanced_suggest_recipes(
-    user_ingredients: List[str],
+    user_ingredients: Union[List[str], FrozenSet[str]],
     recipes: List[Dict[str, Any]],
     preferences: Optional[Dict[str, Any]] = None,
     top_n: int = 10,
@@ -128,7 +513,7 @@ def advanced_suggest_recipes(
     prefs_max_time = int(preferences.get("max_time", 0) or 0)
     prefs_skill = normalize(preferences.get("skill_level") or "intermediate")
 
-    user_set = set(normalize(i) for i in user_ingredients if normalize(i))
+    user_set = prepare_user_set(user_ingredients)
     out = []
     
     w = {
@@ -141,46 +526,61 @@ def advanced_suggest_recipes(
         "missing_penalty": 0.20
     }
 
-    nm = nutrition_module or nutrition_module_local
-    smod = substitutes_module or submod_local
+    if nutrition_module is None:
+        from modules import nutrition as nutrition_module
+    if substitutes_module is None:
+        from modules import substitutes as substitutes_module
+    nm = nutrition_module
+    smod = substitutes_module
 
-    for recipe in recipes:
-        recipe_ings = set(recipe.get("ingredients", []))
-
-        if prefs_allergies:
-            skip = False
-            for allerg in prefs_allergies:
-                if not allerg:
-                    continue
-                for ing in recipe_ings:
-                    if allerg in ing:
-                        skip = True
-                        break
-                if skip:
-                    break
-            if skip:
-                continue
-
-        total = len(recipe_ings) or 1
-        matched = sorted(list(user_set & recipe_ings))
-        missing = sorted(list(recipe_ings - user_set))
-        match_count = len(matched)
+    state = _corpus_state(recipes)
+
+    if np is not None:
+        if "arrays" not in state:
+            state["arrays"] = build_corpus_arrays(recipes)
+        order, scores, ratios, match_counts, totals = _rank_arrays(
+            state["arrays"], user_set, prefs_cuisine, prefs_taste, prefs_diet,
+            prefs_allergies, prefs_max_time, prefs_skill, w, top_n
+        )
+        return [
+            _advanced_result(
+                recipes[i], user_set, float(scores[i]), float(ratios[i]),
+                int(match_counts[i]), int(totals[i]), nm, smod
+            )
+            for i in order.tolist()
+        ]
+
+    vocab, recipe_bits = _corpus_bits(recipes, state)
+    user_bits = sum(1 << vocab[i] for i in user_set if i in vocab)
+    allergen_re = _allergen_pattern(prefs_allergies)
+    allergy_bits = 0
+    if allergen_re is not None:
+        allergy_bits = sum(1 << idx for ing, idx in vocab.items() if allergen_re.search(ing))
+
+    user_skill_rank = _skill_to_rank(prefs_skill)
+    w_ingredient, w_cuisine, w_taste, w_diet, w_time, w_skill, w_missing = (w[k] for k in _WEIGHT_KEYS)
+
+    for recipe, bits in zip(recipes, recipe_bits):
+        if bits & allergy_bits:
+            continue
+
+        total = recipe["_total"] or 1
+        match_count = (bits & user_bits).bit_count()
         match_ratio = match_count / total
         ingredient_score = match_ratio
 
         if prefs_cuisine:
-            cuisine_score = 1.0 if prefs_cuisine == (recipe.get("cuisine") or "").lower() else 0.0
+            cuisine_score = 1.0 if prefs_cuisine == recipe["_cuisine"] else 0.0
         else:
             cuisine_score = 1.0
 
         if prefs_taste:
-            taste_score = 1.0 if prefs_taste in (recipe.get("taste_tags") or []) else 0.0
+            taste_score = 1.0 if prefs_taste in recipe["_taste_set"] else 0.0
         else:
             taste_score = 1.0
 
-        recipe_diets = [d.lower() for d in (recipe.get("diet") or [])]
         if prefs_diet:
-            diet_score = 1.0 if (prefs_diet in recipe_diets) else 0.0
+            diet_score = 1.0 if prefs_diet in recipe["_diet_set"] else 0.0
         else:
             diet_score = 1.0
 
@@ -190,50 +590,27 @@ def advanced_suggest_recipes(
         else:
             time_score = 1.0
 
-        user_skill_rank = _skill_to_rank(prefs_skill)
-        recipe_skill_rank = _skill_to_rank(recipe.get("skill", "intermediate"))
-        skill_score = 1.0 if user_skill_rank >= recipe_skill_rank else (_safe_div(user_skill_rank, recipe_skill_rank))
+        recipe_skill_rank = recipe["_skill_rank"]
+        skill_score = 1.0 if user_skill_rank >= recipe_skill_rank else user_skill_rank / recipe_skill_rank
 
-        missing_pen = (len(missing) / total) if total else 0.0
+        missing_pen = ((recipe["_total"] - match_count) / total) if total else 0.0
 
         raw_score = (
-            w["ingredient"] * ingredient_score +
-            w["cuisine"] * cuisine_score +
-            w["taste"] * taste_score +
-            w["diet"] * diet_score +
-            w["time"] * time_score +
-            w["skill"] * skill_score
-        ) - (w["missing_penalty"] * missing_pen)
+            w_ingredient * ingredient_score +
+            w_cuisine * cuisine_score +
+            w_taste * taste_score +
+            w_diet * diet_score +
+            w_time * time_score +
+            w_skill * skill_score
+        ) - (w_missing * missing_pen)
         
         if raw_score <= 0.0:
             continue
 
-        nutrition_est = _compute_recipe_nutrition(recipe, nm)
-        sub_suggestions = smod.suggest_substitutes(missing, user_set)
-
-        out.append({
-            "title": recipe.get("title"),
-            "image_url": recipe.get("image_url", ""),
-            "score": float(raw_score),
-            "matched": matched,
-            "missing": missing,
-            "match_ratio": match_ratio,
-            "match_count": match_count,
-            "total_required": total,
-            "ingredients": list(recipe_ings),
-            "steps": recipe.get("steps", []),
-            "nutrition": nutrition_est,
-            "substitutes": sub_suggestions,
-            "meta": {
-                "cuisine": recipe.get("cuisine", ""),
-                "diet": recipe.get("diet", []),
-                "time": recipe.get("time", 0),
-                "skill": recipe.get("skill", "intermediate"),
-                "servings": recipe.get("servings", 1),
-                "taste_tags": recipe.get("taste_tags", [])
-            }
-        })
-
-    out.sort(key=lambda r: (r["score"], r["match_ratio"], r["match_count"]), reverse=True)
-    
-    return out[:top_n]
\ No newline at end of file
+        out.append((float(raw_score), match_ratio, match_count, total, recipe))
+
+    top = heapq.nlargest(top_n, out, key=lambda c: (c[0], c[1], c[2]))
+    return [
+        _advanced_result(recipe, user_set, score, match_ratio, match_count, total, nm, smod)
+        for score, match_ratio, match_count, total, recipe in top
+    ]
\ No newline at end of file